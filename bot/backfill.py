@@ -0,0 +1,101 @@
+"""Rebuild the player stats store from historic server logs.
+
+Usage: python backfill.py [--output PATH] logs/*.log.gz [logs/latest.log]
+"""
+import argparse
+import datetime
+import gzip
+import json
+import os
+import re
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from events import parse_line
+from stats import PlayerStats, write_stats
+
+STATS_STORE_PATH = os.getenv('STATS_STORE_PATH') or '/data/player_stats.json'
+
+
+def _named_date(path: Path) -> Optional[datetime.date]:
+    match = re.match(r"(\d{4}-\d{2}-\d{2})", path.name)
+    return datetime.date.fromisoformat(match.group(1)) if match else None
+
+
+def _log_date(path: Path) -> datetime.date:
+    # Rotated logs carry their date in the name; otherwise the mtime dates the last line written.
+    return _named_date(path) or datetime.date.fromtimestamp(path.stat().st_mtime)
+
+
+def _open_log(path: Path):
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8", errors="ignore")
+    return path.open("r", encoding="utf-8", errors="ignore")
+
+
+def _iter_day_offsets(path: Path) -> Iterator[Tuple[int, int, str]]:
+    """Yield (days since the first line, seconds into that day, line) for every timestamped line."""
+    days = 0
+    previous = -1
+    with _open_log(path) as handle:
+        for line in handle:
+            match = re.match(r"\[?(\d{2}):(\d{2}):(\d{2})", line)
+            if not match:
+                continue
+            hours, minutes, seconds = (int(part) for part in match.groups())
+            offset = hours * 3600 + minutes * 60 + seconds
+            if offset < previous:
+                # Log lines only carry the time of day; wrapping back means midnight passed.
+                days += 1
+            previous = offset
+            yield days, offset, line
+
+
+def _first_line_date(path: Path) -> datetime.date:
+    named = _named_date(path)
+    if named:
+        return named
+    # The mtime is the date of the last line, so step back over every midnight the file spans.
+    wraps = 0
+    for wraps, _, _ in _iter_day_offsets(path):
+        pass
+    return _log_date(path) - datetime.timedelta(days=wraps)
+
+
+def iter_timestamped_lines(path: Path) -> Iterator[Tuple[float, str]]:
+    first_day = datetime.datetime.combine(_first_line_date(path), datetime.time())
+    for days, offset, line in _iter_day_offsets(path):
+        yield (first_day + datetime.timedelta(days=days, seconds=offset)).timestamp(), line
+
+
+def _sort_key(path: Path) -> Tuple[int, datetime.date, int]:
+    # latest.log is always the newest file; rotated logs are named YYYY-MM-DD-N.log.gz
+    index = re.search(r"-(\d+)\.log", path.name)
+    return (path.name.startswith("latest"), _log_date(path), int(index.group(1)) if index else 0)
+
+
+def backfill(paths: List[Path]) -> PlayerStats:
+    stats = PlayerStats()
+    for path in sorted(paths, key=_sort_key):
+        print(f"Reading {path}")
+        for timestamp, line in iter_timestamped_lines(path):
+            event = parse_line(line, timestamp)
+            if event:
+                stats.apply(event)
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild player stats from Minecraft server logs.")
+    parser.add_argument("logs", nargs="+", type=Path, help="Server log files (.log or .log.gz)")
+    parser.add_argument("--output", type=Path, default=Path(STATS_STORE_PATH), help="Stats store to overwrite")
+    args = parser.parse_args()
+
+    stats = backfill(args.logs)
+    # Sessions still open at the end of the logs are closed at the last line when the bot loads them.
+    write_stats(args.output, json.dumps(stats.to_dict(saved_at=stats.last_event), separators=(",", ":")))
+    print(f"Wrote stats for {len(stats.players)} players to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
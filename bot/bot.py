@@ -1,10 +1,12 @@
 import asyncio
 import datetime
 import json
+import resource
+import time
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, AsyncIterator, Dict, Optional, Tuple, Union
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 
 import discord
 from discord import ui
@@ -15,7 +17,67 @@ intents = discord.Intents.default()
 intents.message_content = True
 intents.members = True
 intents.guilds = True
-should_output: bool = False
+
+LocalCommand = Callable[[List[str]], Awaitable[str]]
+
+
+def _format_time(timestamp: Optional[float]) -> str:
+    moment = datetime.datetime.fromtimestamp(timestamp) if timestamp is not None else datetime.datetime.now()
+    return moment.strftime('%H:%M:%S')
+
+
+def build_chat_embed(
+    player: Optional[str],
+    message: str,
+    chat_message: bool = False,
+    timestamp: Optional[float] = None,
+) -> discord.Embed:
+    # Multi-line server records can be far longer than the 4096 characters an embed description holds.
+    if len(message) > 3800:
+        message = message[:3800] + "..."
+    embed = discord.Embed(
+        description=f"_<{_format_time(timestamp)}>_ - **{message}**",
+        color= 0xe67a23 if chat_message else 0xffff00 if "advancement" in message else 0xcc0000
+    )
+    if player:
+        avatar_url = f"https://mc-heads.net/avatar/{player}/64"
+        embed.set_author(name=player, icon_url=avatar_url)
+    return embed
+
+
+def build_logon_embed(player: str) -> discord.Embed:
+    embed = discord.Embed(
+        description=f":green_circle: **{player}** has joined the game.",
+        color=0x2ecc71
+    )
+    avatar_url = f"https://mc-heads.net/avatar/{player}/64"
+    embed.set_author(name=player, icon_url=avatar_url)
+    return embed
+
+
+def build_logoff_embed(player: str) -> discord.Embed:
+    embed = discord.Embed(
+        description=f":red_circle: **{player}** has left the game.",
+        color=0xe74c3c
+    )
+    avatar_url = f"https://mc-heads.net/avatar/{player}/64"
+    embed.set_author(name=player, icon_url=avatar_url)
+    return embed
+
+
+def build_error_embed(message: str, timestamp: Optional[float] = None) -> discord.Embed:
+    title, _, details = message.partition("\n")
+    embed = discord.Embed(
+        title=title[:256],
+        description=f"_<{_format_time(timestamp)}>_",
+        color=0x992d22
+    )
+    if details:
+        # Spoiler-wrapped so long stack traces stay collapsed until clicked.
+        if len(details) > 3800:
+            details = details[:3800] + "\n..."
+        embed.description += f"\n||```\n{details}\n```||"
+    return embed
 
 
 @dataclass
@@ -38,6 +100,7 @@ class MinecraftBot:
         rcon_port: Union[str, int],
         rcon_password: str,
         whitelist_store_path: str,
+        lazy_members: bool = False,
     ):
         self.__token = token
         self.__channel_id = int(channel_id)
@@ -55,62 +118,51 @@ class MinecraftBot:
         self._sessions_by_member: Dict[int, VerificationSession] = {}
         self._sessions_by_channel: Dict[int, VerificationSession] = {}
         self._rcon_lock = asyncio.Lock()
-
-        self._client = discord.Client(intents=intents)
+        self._local_commands: Dict[str, LocalCommand] = {}
+        self.__lazy_members = lazy_members
+        self._started_at = time.monotonic()
+        self._bootstrapped = False
+
+        if lazy_members:
+            # Skip guild chunking and only keep the bot's own member cached; others are fetched on demand.
+            self._client = discord.Client(
+                intents=intents,
+                chunk_guilds_at_startup=False,
+                member_cache_flags=discord.MemberCacheFlags.none(),
+            )
+        else:
+            self._client = discord.Client(intents=intents)
         self._register_events()
     
-    async def log_chat(self, player: Optional[str], message: str, chat_message: bool = False) -> None:
-        global should_output
-        if message.strip() == "RCON running on 0.0.0.0:25575":
-            should_output = True
-            return
-        if not should_output:
-            return
-
-        if message.strip() == "Stopping server":
-            should_output = False
-            return
-
-        if message.strip().startswith("Starting minecraft server"):
-            should_output = False
-            return
-
-
-        embed = discord.Embed(
-            description=f"_<{datetime.datetime.now().strftime('%H:%M:%S')}>_ - **{message}**",
-            color= 0xe67a23 if chat_message else 0xffff00 if "advancement" in message else 0xcc0000
-        )
-
-        if player:
-            avatar_url = f"https://mc-heads.net/avatar/{player}/64"
-            embed.set_author(name=player, icon_url=avatar_url)
-
+    async def log_chat(
+        self,
+        player: Optional[str],
+        message: str,
+        chat_message: bool = False,
+        timestamp: Optional[float] = None,
+    ) -> None:
+        embed = build_chat_embed(player, message, chat_message, timestamp)
         async with self.__get_channel() as channel:
             if not channel:
                 return
             await channel.send(embed=embed, silent=chat_message)
     
+    async def log_error(self, message: str, timestamp: Optional[float] = None) -> None:
+        embed = build_error_embed(message, timestamp)
+        async with self.__get_channel() as channel:
+            if not channel:
+                return
+            await channel.send(embed=embed, silent=True)
+
     async def logon(self, player: str) -> None:
-        global should_output
-        should_output = True
-        embed = discord.Embed(
-            description=f":green_circle: **{player}** has joined the game.",
-            color=0x2ecc71 
-        )
-        avatar_url = f"https://mc-heads.net/avatar/{player}/64"
-        embed.set_author(name=player, icon_url=avatar_url)
+        embed = build_logon_embed(player)
         async with self.__get_channel() as channel:
             if not channel:
                 return
             await channel.send(embed=embed, silent=True)
 
     async def logoff(self, player: str) -> None:
-        embed = discord.Embed(
-            description=f":red_circle: **{player}** has left the game.",
-            color=0xe74c3c 
-        )
-        avatar_url = f"https://mc-heads.net/avatar/{player}/64"
-        embed.set_author(name=player, icon_url=avatar_url)
+        embed = build_logoff_embed(player)
         async with self.__get_channel() as channel:
             if not channel:
                 return
@@ -137,13 +189,22 @@ class MinecraftBot:
         await self._client.wait_until_ready()
 
     async def start(self):
+        self._started_at = time.monotonic()
         await self._client.start(self.__token)
 
+    def add_local_command(self, name: str, handler: LocalCommand) -> None:
+        """Handle `!<name> args...` in the command channel instead of forwarding it to RCON."""
+        self._local_commands[name.lower()] = handler
+
     def _register_events(self) -> None:
         @self._client.event
         async def on_ready():
-            print('Bot is ready')
+            print(f"Bot is ready after {time.monotonic() - self._started_at:.2f}s ({self._memory_report()})")
             # await self._announce_start()
+            # on_ready fires again after every re-identify; the member sweep only needs to run once.
+            if self._bootstrapped:
+                return
+            self._bootstrapped = True
             await self._bootstrap_existing_members()
 
         @self._client.event
@@ -282,7 +343,7 @@ class MinecraftBot:
         print(f"Processing confirmation for member {session.member_id} with name {session.minecraft_name}")
         if not guild:
             return False, "Guild not available, please try again later."
-        member = guild.get_member(session.member_id)
+        member = await self._get_member(guild, session.member_id)
         if not member:
             return False, "Could not find your member record."
         if not session.minecraft_name:
@@ -347,7 +408,7 @@ class MinecraftBot:
             print("Cleanup aborted: guild unavailable")
             return
         raw_channel = guild.get_channel(session.channel_id)
-        member = guild.get_member(session.member_id)
+        member = await self._get_member(guild, session.member_id)
         if not raw_channel:
             print(f"Cleanup warning: channel {session.channel_id} missing")
         if raw_channel and not isinstance(raw_channel, discord.TextChannel):
@@ -388,13 +449,46 @@ class MinecraftBot:
             return False
         return str(member.id) not in self._mappings
 
+    def _memory_report(self) -> str:
+        max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        return f"max RSS {max_rss_mb:.1f} MB, lazy member cache {'on' if self.__lazy_members else 'off'}"
+
     async def _bootstrap_existing_members(self) -> None:
         guild = await self.__get_guild()
         if not guild:
             return
-        for member in guild.members:
+        sweep_started = time.monotonic()
+        checked = 0
+        if self.__lazy_members:
+            # Stream the member list page by page instead of holding the whole guild in the cache.
+            members = guild.fetch_members(limit=None)
+        else:
+            members = self._iter_cached_members(guild)
+        async for member in members:
+            checked += 1
+            if not self._member_needs_verification(member):
+                continue
             await self._ensure_verification(member, welcome=False)
             await asyncio.sleep(0.2)
+        # In lazy mode the member list is paid for here rather than before on_ready, so report both.
+        print(
+            f"Member sweep checked {checked} members in {time.monotonic() - sweep_started:.2f}s, "
+            f"{time.monotonic() - self._started_at:.2f}s after start ({self._memory_report()})"
+        )
+
+    async def _iter_cached_members(self, guild: discord.Guild) -> AsyncIterator[discord.Member]:
+        for member in guild.members:
+            yield member
+
+    async def _get_member(self, guild: discord.Guild, member_id: int) -> Optional[discord.Member]:
+        member = guild.get_member(member_id)
+        if member or not self.__lazy_members:
+            return member
+        try:
+            return await guild.fetch_member(member_id)
+        except discord.HTTPException as exc:
+            print(f"Error fetching member {member_id}: {exc}")
+            return None
 
     async def _ensure_verification(self, member: discord.Member, welcome: bool) -> None:
         if not self._member_needs_verification(member):
@@ -500,7 +594,10 @@ class MinecraftBot:
             await message.reply("Please provide a command to execute.", mention_author=False)
             return
         try:
-            response = await self._run_rcon_command(command)
+            if command.startswith("!"):
+                response = await self._run_local_command(command[1:])
+            else:
+                response = await self._run_rcon_command(command)
         except Exception as exc:
             await message.reply(f"Failed to execute command: {exc}", mention_author=False)
             return
@@ -516,6 +613,14 @@ class MinecraftBot:
         except discord.HTTPException as exc:
             print(f"Error sending RCON response: {exc}")
 
+    async def _run_local_command(self, command: str) -> str:
+        name, *args = command.split() or [""]
+        handler = self._local_commands.get(name.lower())
+        if not handler:
+            available = ", ".join(f"!{n}" for n in sorted(self._local_commands)) or "none"
+            return f"Unknown bot command '!{name}'. Available: {available}"
+        return await handler(args)
+
     async def _run_rcon_command(self, command: str) -> str:
         async with self._rcon_lock:
             await asyncio.sleep(0)
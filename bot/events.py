@@ -0,0 +1,116 @@
+import re
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class LogEvent:
+    kind: str  # "chat", "logon", "logoff", "server" or "error"
+    message: str
+    player: Optional[str] = None
+    timestamp: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "player": self.player,
+            "message": self.message,
+            "timestamp": self.timestamp,
+        }
+
+
+def parse_line(line: str, timestamp: Optional[float] = None) -> Optional[LogEvent]:
+    ts = time.time() if timestamp is None else timestamp
+    line = line.strip()
+    match = re.match(r"\[?\d{2}:\d{2}:\d{2}\]? \[[^\]]+/(WARN|ERROR|FATAL)\]: ", line)
+    if match and (match.group(1) != "WARN" or "\n" in line):
+        # Errors and multi-line warnings (usually stack traces) are relayed as one record.
+        return LogEvent("error", line[match.end():], None, ts)
+
+    match = re.search(r"\[Server thread/INFO\]: <(\w+)> (.*)", line)
+    if match:
+        username = match.group(1)
+        message = match.group(2)
+        # print(f"Verified Chat -> {username}: {message}")
+        return LogEvent("chat", message, username, ts)
+
+    match = re.search(r"\[Server thread/INFO\]: (\w+) joined the game", line)
+    if match:
+        username = match.group(1)
+        return LogEvent("logon", f"{username} joined the game", username, ts)
+
+    match = re.search(r"\[Server thread/INFO\]: (\w+) left the game", line)
+    if match:
+        username = match.group(1)
+        return LogEvent("logoff", f"{username} left the game", username, ts)
+
+    match = re.search(r"\[Server thread/INFO\]: ([\w ]+)", line)
+    if match:
+        ignore_messages = [
+            "lost connection: Disconnected",
+            "logged in with entity id",
+            "Server empty for "
+        ]
+
+        message = line.split("[Server thread/INFO]:")[-1].strip()
+        if not( message.startswith('[') and message.endswith(']')) and all(ignore not in message for ignore in ignore_messages):
+            return LogEvent("server", message, None, ts)
+
+    return None
+
+
+class OutputGate:
+    """Hides boot and shutdown noise: server messages are only relayed between startup and shutdown."""
+
+    def __init__(self):
+        self.open = False
+
+    def allow(self, event: LogEvent) -> bool:
+        if event.kind == "logon":
+            self.open = True
+            return True
+        if event.kind == "logoff":
+            return True
+        message = event.message.strip()
+        if message == "RCON running on 0.0.0.0:25575":
+            self.open = True
+            return False
+        if not self.open:
+            return False
+        if message == "Stopping server" or message.startswith("Starting minecraft server"):
+            self.open = False
+            return False
+        return True
+
+
+class ErrorThrottle:
+    """Relays a repeated error title at most once per window and reports how often it was suppressed."""
+
+    def __init__(self, window: float = 300.0, max_titles: int = 256):
+        self._window = window
+        self._max_titles = max_titles
+        # title -> [last relayed timestamp, repeats suppressed since]
+        self._seen: Dict[str, List[float]] = {}
+
+    def admit(self, event: LogEvent) -> Optional[LogEvent]:
+        if event.kind != "error":
+            return event
+        title, sep, details = event.message.partition("\n")
+        entry = self._seen.get(title)
+        if entry and event.timestamp - entry[0] < self._window:
+            entry[1] += 1
+            return None
+        suppressed = int(entry[1]) if entry else 0
+        self._seen[title] = [event.timestamp, 0]
+        self._prune(event.timestamp)
+        if suppressed:
+            return replace(event, message=f"{title} (repeated {suppressed} more times){sep}{details}")
+        return event
+
+    def _prune(self, now: float) -> None:
+        if len(self._seen) <= self._max_titles:
+            return
+        self._seen = {title: entry for title, entry in self._seen.items() if now - entry[0] < self._window}
+        while len(self._seen) > self._max_titles:
+            del self._seen[min(self._seen, key=lambda title: self._seen[title][0])]
@@ -1,5 +1,57 @@
 import asyncio
-from typing import Callable, Awaitable
+import re
+from typing import Callable, Awaitable, List
+
+# Lines produced by the log4j socket appender start with "HH:mm:ss [thread/LEVEL]: ".
+# Anything else (stack frames, multi-line plugin output) continues the previous record.
+RECORD_START = re.compile(r"^\[?\d{2}:\d{2}:\d{2}\]? \[[^\]]+/[A-Z]+\]: ")
+MAX_RECORD_LINES = 200
+MAX_RECORD_CHARS = 16000
+FLUSH_TIMEOUT = 0.5
+
+
+class RecordAssembler:
+    """Groups continuation lines into their parent log record, bounded in size."""
+
+    def __init__(self, max_lines: int = MAX_RECORD_LINES, max_chars: int = MAX_RECORD_CHARS):
+        self._max_lines = max_lines
+        self._max_chars = max_chars
+        self._lines: List[str] = []
+        self._chars = 0
+        self._truncated = 0
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._lines)
+
+    def feed(self, line: str) -> List[str]:
+        """Add a line and return any records it completed."""
+        line = line.rstrip("\r")
+        if RECORD_START.match(line) or not self._lines:
+            completed = self.flush()
+            if len(line) > self._max_chars:
+                line = line[:self._max_chars] + "..."
+            self._lines = [line]
+            self._chars = len(line)
+            return completed
+        # Once a line has been cut, drop the rest too so the record never has a gap in the middle.
+        if self._truncated or len(self._lines) >= self._max_lines or self._chars + len(line) > self._max_chars:
+            self._truncated += 1
+        else:
+            self._lines.append(line)
+            self._chars += len(line) + 1
+        return []
+
+    def flush(self) -> List[str]:
+        if not self._lines:
+            return []
+        if self._truncated:
+            self._lines.append(f"... ({self._truncated} more lines truncated)")
+        record = "\n".join(self._lines)
+        self._lines = []
+        self._chars = 0
+        self._truncated = 0
+        return [record]
 
 
 async def start_subscriber(host: str, port: int, process_line: Callable[[str], Awaitable[None]]):
@@ -7,16 +59,43 @@ async def start_subscriber(host: str, port: int, process_line: Callable[[str], A
         addr = writer.get_extra_info('peername')
         print(f"--- Minecraft Server Connected from {addr} ---")
         buffer = ""
+        discarding = False
+        assembler = RecordAssembler()
         try:
             while True:
-                data = await reader.read(4096)
+                if assembler.pending:
+                    try:
+                        data = await asyncio.wait_for(reader.read(4096), FLUSH_TIMEOUT)
+                    except asyncio.TimeoutError:
+                        # No continuation arrived in time, the pending record is complete.
+                        for record in assembler.flush():
+                            await process_line(record)
+                        continue
+                else:
+                    data = await reader.read(4096)
                 if not data:
                     print("--- Minecraft Server Disconnected ---")
                     break
                 buffer += data.decode('utf-8', errors='ignore')
+                if discarding:
+                    # Skip the remainder of an oversized line up to its newline.
+                    if "\n" not in buffer:
+                        buffer = ""
+                        continue
+                    buffer = buffer.split("\n", 1)[1]
+                    discarding = False
                 while "\n" in buffer:
                     line, buffer = buffer.split("\n", 1)
-                    await process_line(line)
+                    for record in assembler.feed(line):
+                        await process_line(record)
+                if len(buffer) > MAX_RECORD_CHARS:
+                    # Pass on the head of an oversized line marked as cut and drop the rest of it.
+                    for record in assembler.feed(buffer[:MAX_RECORD_CHARS] + "..."):
+                        await process_line(record)
+                    buffer = ""
+                    discarding = True
+            for record in assembler.flush():
+                await process_line(record)
         except Exception as e:
             print(f"Connection Error: {e}")
         finally:
@@ -27,4 +106,3 @@ async def start_subscriber(host: str, port: int, process_line: Callable[[str], A
     print(f"Listening for Minecraft data on {port}...")
     async with server:
         await server.serve_forever()
-
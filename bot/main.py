@@ -1,11 +1,12 @@
 import asyncio
 import os
-import re
-from typing import Callable, Awaitable
+from typing import Callable, Awaitable, List
 
 
 from bot import MinecraftBot
+from events import parse_line
 from listener import start_subscriber
+from sinks import DiscordChannelSink, EventSink, HttpPostSink, JsonlFileSink, SinkDispatcher, StatsSink, WebhookSink
 
 TOKEN = os.getenv('DISCORD_BOT_TOKEN') or ''
 CHANNEL_ID = os.getenv('DISCORD_CHANNEL_ID') or ''
@@ -16,61 +17,26 @@ RCON_HOST = os.getenv('RCON_HOST') or ''
 RCON_PORT = os.getenv('RCON_PORT') or ''
 RCON_PASSWORD = os.getenv('RCON_PASSWORD') or ''
 WHITELIST_STORE_PATH = os.getenv('WHITELIST_STORE_PATH') or '/data/discord_mappings.json'
+LAZY_MEMBER_CACHE = (os.getenv('DISCORD_LAZY_MEMBER_CACHE') or '').lower() in ('1', 'true', 'yes')
+SINK_WEBHOOK_URL = os.getenv('SINK_WEBHOOK_URL') or ''
+SINK_JSONL_PATH = os.getenv('SINK_JSONL_PATH') or ''
+SINK_HTTP_URL = os.getenv('SINK_HTTP_URL') or ''
+SINK_STATS_INTERVAL = float(os.getenv('SINK_STATS_INTERVAL') or 0)
+STATS_STORE_PATH = os.getenv('STATS_STORE_PATH') or '/data/player_stats.json'
+STATS_SNAPSHOT_INTERVAL = float(os.getenv('STATS_SNAPSHOT_INTERVAL') or 60)
 HOST = '0.0.0.0'
 PORT = 9999
 
 
 
 
-def process_line(minecraft_bot: MinecraftBot) -> Callable[[str], Awaitable[None]]:
+def process_line(dispatcher: SinkDispatcher) -> Callable[[str], Awaitable[None]]:
 
     async def inner(line: str):
         print(f"Received Line: {line}")
-        line = line.strip()
-        match = re.search(r"\[Server thread/INFO\]: <(\w+)> (.*)", line)
-        if match:
-            username = match.group(1)
-            message = match.group(2)
-            # print(f"Verified Chat -> {username}: {message}")
-            try:
-                await minecraft_bot.log_chat(username, message, True)
-            except Exception as e:
-                print(f"Error logging chat: {e}")
-            return
-        
-        match = re.search(r"\[Server thread/INFO\]: (\w+) joined the game", line)
-        if match:
-            username = match.group(1)
-            try:
-                await minecraft_bot.logon(username)
-            except Exception as e:
-                print(f"Error logging chat: {e}")
-            return
-    
-        match = re.search(r"\[Server thread/INFO\]: (\w+) left the game", line)
-        if match:
-            username = match.group(1)
-            try:
-                await minecraft_bot.logoff(username)
-            except Exception as e:
-                print(f"Error logging chat: {e}")
-            return
-
-        match = re.search(r"\[Server thread/INFO\]: ([\w ]+)", line)
-        if match:
-            ignore_messages = [
-                "lost connection: Disconnected",
-                "logged in with entity id",
-                "Server empty for "
-            ]
-
-            message = line.split("[Server thread/INFO]:")[-1].strip()
-            if not( message.startswith('[') and message.endswith(']')) and all(ignore not in message for ignore in ignore_messages):
-                try:
-                    await minecraft_bot.log_chat(None, message, False)
-                except Exception as e:
-                    print(f"Error logging chat: {e}")
-                return
+        event = parse_line(line)
+        if event:
+            dispatcher.publish(event)
 
     return inner
 
@@ -101,13 +67,32 @@ async def main():
         RCON_PORT,
         RCON_PASSWORD,
         WHITELIST_STORE_PATH,
+        lazy_members=LAZY_MEMBER_CACHE,
     )
 
+    stats_sink = StatsSink(STATS_STORE_PATH, STATS_SNAPSHOT_INTERVAL)
+    sinks: List[EventSink] = [DiscordChannelSink(minecraft_bot), stats_sink]
+    if SINK_WEBHOOK_URL:
+        sinks.append(WebhookSink(SINK_WEBHOOK_URL))
+    if SINK_JSONL_PATH:
+        sinks.append(JsonlFileSink(SINK_JSONL_PATH))
+    if SINK_HTTP_URL:
+        sinks.append(HttpPostSink(SINK_HTTP_URL))
+    dispatcher = SinkDispatcher(sinks)
+
+    async def sink_stats(_: List[str]) -> str:
+        return dispatcher.format_stats()
+
+    minecraft_bot.add_local_command('sinks', sink_stats)
+    minecraft_bot.add_local_command('top', stats_sink.top_command)
+    minecraft_bot.add_local_command('stats', stats_sink.player_command)
+
     bot = minecraft_bot.start()
 
     await asyncio.gather(
         bot,
-        start_subscriber(HOST, PORT, process_line(minecraft_bot))
+        dispatcher.run(SINK_STATS_INTERVAL),
+        start_subscriber(HOST, PORT, process_line(dispatcher))
     )
 
 if __name__ == "__main__":
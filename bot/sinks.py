@@ -0,0 +1,402 @@
+import asyncio
+import datetime
+import json
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import aiohttp
+import discord
+
+from bot import MinecraftBot, build_chat_embed, build_error_embed, build_logoff_embed, build_logon_embed
+from events import ErrorThrottle, LogEvent, OutputGate
+from stats import CHATS, LAST_SEEN, SESSIONS, format_duration, load_stats, write_stats
+
+RATE_WINDOW = 60.0
+
+
+class PartialDelivery(Exception):
+    """Raised by a sink when only the first `sent` events of a batch were delivered."""
+
+    def __init__(self, sent: int, cause: Exception):
+        super().__init__(str(cause))
+        self.sent = sent
+        self.cause = cause
+
+
+def is_permanent_failure(exc: Exception) -> bool:
+    """Client errors (4xx other than rate limits) will fail the same way on every retry."""
+    if isinstance(exc, discord.HTTPException):
+        status = exc.status
+    elif isinstance(exc, aiohttp.ClientResponseError):
+        status = exc.status
+    else:
+        return False
+    return 400 <= status < 500 and status != 429
+
+
+class EventSink:
+    """Base class for event destinations. Subclasses implement `send_batch`."""
+
+    name = "sink"
+
+    def __init__(self, batch_size: int = 1, queue_size: int = 1000):
+        self.batch_size = max(1, batch_size)
+        self.queue_size = max(1, queue_size)
+
+    def admit(self, event: LogEvent) -> Optional[LogEvent]:
+        """Called once per event, in order, before it is queued. Return the event to queue, or None to skip it."""
+        return event
+
+    async def open(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    async def send_batch(self, events: List[LogEvent]) -> None:
+        raise NotImplementedError
+
+
+class DiscordChannelSink(EventSink):
+    name = "discord"
+
+    def __init__(self, minecraft_bot: MinecraftBot, batch_size: int = 1, queue_size: int = 1000):
+        super().__init__(batch_size, queue_size)
+        self._bot = minecraft_bot
+        self._gate = OutputGate()
+        self._throttle = ErrorThrottle()
+
+    def admit(self, event: LogEvent) -> Optional[LogEvent]:
+        return self._throttle.admit(event) if self._gate.allow(event) else None
+
+    async def send_batch(self, events: List[LogEvent]) -> None:
+        for event in events:
+            if event.kind == "chat":
+                await self._bot.log_chat(event.player, event.message, True, event.timestamp)
+            elif event.kind == "logon" and event.player:
+                await self._bot.logon(event.player)
+            elif event.kind == "logoff" and event.player:
+                await self._bot.logoff(event.player)
+            elif event.kind == "error":
+                await self._bot.log_error(event.message, event.timestamp)
+            else:
+                await self._bot.log_chat(None, event.message, False, event.timestamp)
+
+
+class WebhookSink(EventSink):
+    """Posts events to a Discord webhook, up to 10 embeds per message."""
+
+    name = "webhook"
+
+    def __init__(self, url: str, batch_size: int = 10, queue_size: int = 1000):
+        super().__init__(min(batch_size, 10), queue_size)
+        self._url = url
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._webhook: Optional[discord.Webhook] = None
+        self._gate = OutputGate()
+        self._throttle = ErrorThrottle()
+
+    async def open(self) -> None:
+        self._session = aiohttp.ClientSession()
+        self._webhook = discord.Webhook.from_url(self._url, session=self._session)
+
+    async def close(self) -> None:
+        if self._session:
+            await self._session.close()
+
+    def admit(self, event: LogEvent) -> Optional[LogEvent]:
+        return self._throttle.admit(event) if self._gate.allow(event) else None
+
+    async def send_batch(self, events: List[LogEvent]) -> None:
+        assert self._webhook
+        embeds = []
+        for event in events:
+            if event.kind == "logon" and event.player:
+                embeds.append(build_logon_embed(event.player))
+            elif event.kind == "logoff" and event.player:
+                embeds.append(build_logoff_embed(event.player))
+            elif event.kind == "error":
+                embeds.append(build_error_embed(event.message, event.timestamp))
+            else:
+                embeds.append(build_chat_embed(event.player, event.message, event.kind == "chat", event.timestamp))
+        # A webhook message holds at most 10 embeds and 6000 characters across them.
+        sent = 0
+        chunk: List[discord.Embed] = []
+        try:
+            for embed in embeds:
+                if chunk and (len(chunk) == 10 or sum(len(e) for e in chunk) + len(embed) > 6000):
+                    await self._webhook.send(embeds=chunk, silent=True)
+                    sent += len(chunk)
+                    chunk = []
+                chunk.append(embed)
+            if chunk:
+                await self._webhook.send(embeds=chunk, silent=True)
+        except Exception as exc:
+            if sent:
+                raise PartialDelivery(sent, exc) from exc
+            raise
+
+
+class JsonlFileSink(EventSink):
+    name = "jsonl"
+
+    def __init__(self, path: str, batch_size: int = 100, queue_size: int = 10000):
+        super().__init__(batch_size, queue_size)
+        self._path = Path(path)
+
+    async def open(self) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+
+    async def send_batch(self, events: List[LogEvent]) -> None:
+        payload = "".join(json.dumps(event.to_dict()) + "\n" for event in events)
+        await asyncio.to_thread(self._append, payload)
+
+    def _append(self, payload: str) -> None:
+        with self._path.open("a", encoding="utf-8") as handle:
+            handle.write(payload)
+
+
+class HttpPostSink(EventSink):
+    """POSTs each batch as a JSON array to a generic HTTP endpoint."""
+
+    name = "http"
+
+    def __init__(self, url: str, batch_size: int = 50, queue_size: int = 5000, timeout: float = 10.0):
+        super().__init__(batch_size, queue_size)
+        self._url = url
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def open(self) -> None:
+        self._session = aiohttp.ClientSession(timeout=self._timeout)
+
+    async def close(self) -> None:
+        if self._session:
+            await self._session.close()
+
+    async def send_batch(self, events: List[LogEvent]) -> None:
+        assert self._session
+        async with self._session.post(self._url, json=[event.to_dict() for event in events]) as response:
+            response.raise_for_status()
+
+
+class StatsSink(EventSink):
+    """Keeps PlayerStats up to date and snapshots it to disk periodically."""
+
+    name = "stats"
+
+    def __init__(self, path: str, snapshot_interval: float = 60.0, batch_size: int = 500, queue_size: int = 10000):
+        super().__init__(batch_size, queue_size)
+        self._path = Path(path)
+        self._snapshot_interval = snapshot_interval
+        self.stats = load_stats(self._path)
+        self._changed = False
+        self._snapshot_task: Optional[asyncio.Task] = None
+
+    async def open(self) -> None:
+        self._snapshot_task = asyncio.create_task(self._snapshot_loop())
+
+    async def close(self) -> None:
+        if self._snapshot_task:
+            self._snapshot_task.cancel()
+        try:
+            await self._snapshot()
+        except OSError as exc:
+            print(f"Failed to write player stats snapshot: {exc}")
+
+    async def send_batch(self, events: List[LogEvent]) -> None:
+        for event in events:
+            self.stats.apply(event)
+        self._changed = True
+
+    async def _snapshot_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._snapshot_interval)
+            try:
+                await self._snapshot()
+            except OSError as exc:
+                print(f"Failed to write player stats snapshot: {exc}")
+
+    async def _snapshot(self) -> None:
+        if not self._changed:
+            return
+        self._changed = False
+        payload = json.dumps(self.stats.to_dict(), separators=(",", ":"))
+        await asyncio.to_thread(write_stats, self._path, payload)
+
+    async def top_command(self, _: List[str]) -> str:
+        board = self.stats.leaderboard()
+        if not board:
+            return "No playtime recorded yet."
+        return "\n".join(
+            f"{rank}. {name} - {format_duration(seconds)}" for rank, (name, seconds) in enumerate(board, 1)
+        )
+
+    async def player_command(self, args: List[str]) -> str:
+        if not args:
+            peak_count, peak_at = self.stats.peak
+            peak_time = datetime.datetime.fromtimestamp(peak_at).strftime('%Y-%m-%d %H:%M') if peak_at else "never"
+            return (
+                f"Players tracked: {len(self.stats.players)}\n"
+                f"Online now: {len(self.stats.online)}\n"
+                f"Peak concurrency: {peak_count} ({peak_time})"
+            )
+        name = args[0]
+        record = self.stats.players.get(name)
+        if not record:
+            return f"No stats recorded for {name}."
+        last_seen = datetime.datetime.fromtimestamp(record[LAST_SEEN]).strftime('%Y-%m-%d %H:%M')
+        status = "online" if name in self.stats.online else f"last seen {last_seen}"
+        return (
+            f"{name} ({status})\n"
+            f"Playtime: {format_duration(self.stats.playtime(name))}\n"
+            f"Sessions: {int(record[SESSIONS])}\n"
+            f"Chat messages: {int(record[CHATS])}"
+        )
+
+
+class SinkWorker:
+    """Owns the queue of a single sink so that a slow or failing sink never blocks the others."""
+
+    def __init__(self, sink: EventSink):
+        self.sink = sink
+        self._queue: Deque[LogEvent] = deque(maxlen=sink.queue_size)
+        self._ready = asyncio.Event()
+        self._in_flight: Optional[LogEvent] = None
+        self._recent: Deque[Tuple[float, int]] = deque()
+        self._backoff = 0.0
+        self.delivered = 0
+        self.failures = 0
+        self.dropped = 0
+        self.last_error: Optional[str] = None
+
+    def put(self, event: LogEvent) -> None:
+        admitted = self.sink.admit(event)
+        if not admitted:
+            return
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1  # deque drops the oldest entry on append
+        self._queue.append(admitted)
+        self._ready.set()
+
+    async def run(self) -> None:
+        try:
+            await self.sink.open()
+        except Exception as exc:
+            print(f"Sink {self.sink.name} failed to open: {exc}")
+            self.last_error = str(exc)
+            return
+        try:
+            while True:
+                await self._ready.wait()
+                batch = [self._queue.popleft() for _ in range(min(self.sink.batch_size, len(self._queue)))]
+                if not self._queue:
+                    self._ready.clear()
+                if batch:
+                    await self._deliver(batch)
+        finally:
+            await self.sink.close()
+
+    async def _deliver(self, batch: List[LogEvent]) -> None:
+        self._in_flight = batch[0]
+        try:
+            await self.sink.send_batch(batch)
+        except Exception as exc:
+            self.failures += 1
+            self.last_error = str(exc)
+            if isinstance(exc, PartialDelivery):
+                self._record_delivered(exc.sent)
+                batch = batch[exc.sent:]
+                exc = exc.cause
+            if is_permanent_failure(exc):
+                self.dropped += len(batch)
+                print(f"Sink {self.sink.name} rejected {len(batch)} event(s), dropping them: {exc}")
+                return
+            self._backoff = min(max(self._backoff * 2, 1.0), 30.0)
+            print(f"Sink {self.sink.name} failed to deliver {len(batch)} event(s), retrying in {self._backoff:.0f}s: {exc}")
+            self._requeue(batch)
+            await asyncio.sleep(self._backoff)
+            return
+        finally:
+            self._in_flight = None
+        self._backoff = 0.0
+        self._record_delivered(len(batch))
+
+    def _record_delivered(self, count: int) -> None:
+        self.delivered += count
+        self._recent.append((time.monotonic(), count))
+        self._prune_recent()
+
+    def _requeue(self, batch: List[LogEvent]) -> None:
+        # Events queued while the batch was in flight may have used up its room; keep dropping the oldest.
+        excess = len(batch) + len(self._queue) - self.sink.queue_size
+        if excess > 0:
+            self.dropped += excess
+            batch = batch[excess:]
+        self._queue.extendleft(reversed(batch))
+        if self._queue:
+            self._ready.set()
+
+    def lag(self) -> float:
+        """Age of the oldest event not yet delivered, including the batch in flight."""
+        oldest = self._in_flight or (self._queue[0] if self._queue else None)
+        return time.time() - oldest.timestamp if oldest else 0.0
+
+    def rate(self) -> float:
+        """Events delivered per second over the last RATE_WINDOW seconds."""
+        self._prune_recent()
+        return sum(count for _, count in self._recent) / RATE_WINDOW
+
+    def _prune_recent(self) -> None:
+        cutoff = time.monotonic() - RATE_WINDOW
+        while self._recent and self._recent[0][0] < cutoff:
+            self._recent.popleft()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sink": self.sink.name,
+            "queued": len(self._queue),
+            "delivered": self.delivered,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "rate": self.rate(),
+            "lag": self.lag(),
+            "last_error": self.last_error,
+        }
+
+
+class SinkDispatcher:
+    def __init__(self, sinks: List[EventSink]):
+        self._workers = [SinkWorker(sink) for sink in sinks]
+
+    def publish(self, event: LogEvent) -> None:
+        for worker in self._workers:
+            worker.put(event)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [worker.stats() for worker in self._workers]
+
+    def format_stats(self) -> str:
+        lines = []
+        for s in self.stats():
+            line = (
+                f"{s['sink']}: queued={s['queued']} delivered={s['delivered']} failures={s['failures']} "
+                f"dropped={s['dropped']} rate={s['rate']:.2f}/s lag={s['lag']:.2f}s"
+            )
+            if s["last_error"]:
+                line += f" last_error={s['last_error']}"
+            lines.append(line)
+        return "\n".join(lines) or "No sinks configured."
+
+    async def run(self, stats_interval: float = 0) -> None:
+        tasks = [worker.run() for worker in self._workers]
+        if stats_interval > 0:
+            tasks.append(self._report_stats(stats_interval))
+        await asyncio.gather(*tasks)
+
+    async def _report_stats(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            print(f"Sink stats:\n{self.format_stats()}")
@@ -0,0 +1,138 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from events import LogEvent
+
+
+# Per-player record: [playtime_seconds, sessions, chat_messages, last_seen]
+PLAYTIME, SESSIONS, CHATS, LAST_SEEN = range(4)
+
+
+class PlayerStats:
+    """Playtime and activity aggregates, updated incrementally from parsed events."""
+
+    def __init__(self, leaderboard_size: int = 10):
+        self._leaderboard_size = leaderboard_size
+        self.players: Dict[str, List[float]] = {}
+        self.online: Dict[str, float] = {}
+        self.peak: Tuple[int, float] = (0, 0.0)
+        self.last_event = 0.0
+        # Top players by completed-session playtime; totals only grow, so this can be kept incrementally.
+        self._leaderboard: List[Tuple[str, float]] = []
+
+    def apply(self, event: LogEvent) -> None:
+        self.last_event = max(self.last_event, event.timestamp)
+        if event.kind == "logon" and event.player:
+            self._logon(event.player, event.timestamp)
+        elif event.kind == "logoff" and event.player:
+            self._logoff(event.player, event.timestamp)
+        elif event.kind == "chat" and event.player:
+            record = self._record(event.player)
+            record[CHATS] += 1
+            record[LAST_SEEN] = event.timestamp
+        elif event.kind == "server" and (
+            event.message == "Stopping server" or event.message.startswith("Starting minecraft server")
+        ):
+            # Nobody survives a restart; close sessions whose logoff line never arrived.
+            for player in list(self.online):
+                self._logoff(player, event.timestamp)
+
+    def _record(self, player: str) -> List[float]:
+        record = self.players.get(player)
+        if record is None:
+            record = self.players[player] = [0.0, 0, 0, 0.0]
+        return record
+
+    def _logon(self, player: str, timestamp: float) -> None:
+        if player in self.online:
+            self._logoff(player, timestamp)
+        record = self._record(player)
+        record[SESSIONS] += 1
+        record[LAST_SEEN] = timestamp
+        self.online[player] = timestamp
+        if len(self.online) > self.peak[0]:
+            self.peak = (len(self.online), timestamp)
+
+    def _logoff(self, player: str, timestamp: float) -> None:
+        joined = self.online.pop(player, None)
+        if joined is None:
+            return
+        record = self._record(player)
+        record[PLAYTIME] += max(0.0, timestamp - joined)
+        record[LAST_SEEN] = timestamp
+        self._update_leaderboard(player, record[PLAYTIME])
+
+    def playtime(self, player: str, now: Optional[float] = None) -> float:
+        record = self.players.get(player)
+        total = record[PLAYTIME] if record else 0.0
+        joined = self.online.get(player)
+        if joined is not None:
+            total += max(0.0, (time.time() if now is None else now) - joined)
+        return total
+
+    def _update_leaderboard(self, player: str, total: float) -> None:
+        board = [entry for entry in self._leaderboard if entry[0] != player]
+        if len(board) < self._leaderboard_size or total > board[-1][1]:
+            board.append((player, total))
+            board.sort(key=lambda entry: entry[1], reverse=True)
+            del board[self._leaderboard_size:]
+        self._leaderboard = board
+
+    def _rebuild_leaderboard(self) -> None:
+        ranked = sorted(self.players.items(), key=lambda item: item[1][PLAYTIME], reverse=True)
+        self._leaderboard = [(name, record[PLAYTIME]) for name, record in ranked[:self._leaderboard_size]]
+
+    def leaderboard(self, now: Optional[float] = None) -> List[Tuple[str, float]]:
+        """Top players by playtime, counting sessions still in progress."""
+        # Anyone outside the completed-session board who is offline cannot outrank its last entry.
+        candidates = {name for name, _ in self._leaderboard} | set(self.online)
+        ranked = sorted(((name, self.playtime(name, now)) for name in candidates), key=lambda entry: entry[1], reverse=True)
+        return ranked[:self._leaderboard_size]
+
+    def to_dict(self, saved_at: Optional[float] = None) -> Dict[str, Any]:
+        return {
+            "version": 1,
+            "saved_at": time.time() if saved_at is None else saved_at,
+            "players": self.players,
+            "online": self.online,
+            "peak": list(self.peak),
+        }
+
+    def load_dict(self, data: Dict[str, Any]) -> None:
+        self.players = {name: list(record) for name, record in data.get("players", {}).items()}
+        self.online = dict(data.get("online", {}))
+        peak = data.get("peak") or [0, 0.0]
+        self.peak = (int(peak[0]), float(peak[1]))
+        # Nothing is known about these sessions after the snapshot was taken, so end them there
+        # rather than counting the time the bot was down; the next logon starts a fresh session.
+        saved_at = float(data.get("saved_at") or 0.0)
+        for player, joined in list(self.online.items()):
+            self._logoff(player, max(joined, saved_at))
+        self._rebuild_leaderboard()
+
+
+def load_stats(path: Path) -> PlayerStats:
+    stats = PlayerStats()
+    if not path.exists():
+        return stats
+    try:
+        stats.load_dict(json.loads(path.read_text()))
+    except (json.JSONDecodeError, OSError, ValueError, TypeError, IndexError) as exc:
+        print(f"Warning: could not load player stats store: {exc}")
+    return stats
+
+
+def write_stats(path: Path, payload: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(payload)
+    os.replace(tmp_path, path)
+
+
+def format_duration(seconds: float) -> str:
+    minutes, _ = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m"